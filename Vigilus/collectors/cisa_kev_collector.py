@@ -1,7 +1,44 @@
 from typing import List, Dict, Any
 from datetime import datetime, timezone
-import json
+import ijson
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CATALOG_URL = "https://www.cisa.gov/known-exploited-vulnerabilities-catalog"
+
+# Shared session so repeated KEV polls reuse the pooled TCP/TLS connection.
+_SESSION = requests.Session()
+_SESSION.headers.update({"Accept-Encoding": "gzip"})
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    ),
+)
+
+
+def _normalize_vuln(v: Dict[str, Any]) -> Dict[str, Any]:
+    cve_id = v.get("cveID", "UNKNOWN")
+    vendor = v.get("vendorProject", "Unknown vendor")
+    product = v.get("product", "Unknown product")
+    date_added = v.get("dateAdded") or datetime.now(timezone.utc).isoformat()
+    desc = v.get("shortDescription", "")
+
+    title = f"{vendor} {product} - {cve_id}"
+
+    return {
+        "source": "cisa_kev",
+        "external_id": cve_id,
+        "title": title,
+        "text": desc,
+        "url": CATALOG_URL,
+        "timestamp": date_added,
+        "extra_json": orjson.dumps(v).decode(),
+    }
 
 
 def fetch_cisa_kev(url: str) -> List[Dict[str, Any]]:
@@ -15,35 +52,12 @@ def fetch_cisa_kev(url: str) -> List[Dict[str, Any]]:
       url: KEV catalog URL
       timestamp: dateAdded
       extra_json: full raw entry as JSON string
+    The catalog is streamed entry by entry, so the whole parsed document
+    never sits in memory alongside the normalized items.
     """
-    resp = requests.get(url, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-
-    vulns = data.get("vulnerabilities", [])
-    items: List[Dict[str, Any]] = []
-
-    catalog_url = "https://www.cisa.gov/known-exploited-vulnerabilities-catalog"
-
-    for v in vulns:
-        cve_id = v.get("cveID", "UNKNOWN")
-        vendor = v.get("vendorProject", "Unknown vendor")
-        product = v.get("product", "Unknown product")
-        date_added = v.get("dateAdded") or datetime.now(timezone.utc).isoformat()
-        desc = v.get("shortDescription", "")
-
-        title = f"{vendor} {product} - {cve_id}"
-
-        items.append(
-            {
-                "source": "cisa_kev",
-                "external_id": cve_id,
-                "title": title,
-                "text": desc,
-                "url": catalog_url,
-                "timestamp": date_added,
-                "extra_json": json.dumps(v),
-            }
-        )
-
-    return items
+    with _SESSION.get(url, timeout=15, stream=True) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True  # let urllib3 undo gzip before ijson reads it
+
+        vulns = ijson.items(resp.raw, "vulnerabilities.item", use_float=True)
+        return [_normalize_vuln(v) for v in vulns]
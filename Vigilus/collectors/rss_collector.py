@@ -1,17 +1,26 @@
 from typing import List, Dict, Any
 from datetime import datetime, timezone
+from concurrent.futures import Executor, ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import os
+
+import aiohttp
 import feedparser
 
+# Max number of feeds fetched at once; the connector limits below cap the
+# underlying sockets independently of this.
+RSS_CONCURRENCY = 20
+RSS_TIMEOUT_SECONDS = 15
 
-def fetch_rss_feed(name: str, url: str) -> List[Dict[str, Any]]:
-    """
-    Fetch a single RSS feed and return a list of normalized items.
-    Each item:
-      source: "rss"
-      external_id: link or guid
-      title, text, url, timestamp
-    """
-    feed = feedparser.parse(url)
+# Parser workers start while the event loop (and its resolver threads) is
+# running, so never fork: forkserver where available, spawn otherwise.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _normalize_entries(name: str, feed: Any) -> List[Dict[str, Any]]:
     items: List[Dict[str, Any]] = []
 
     for entry in feed.entries:
@@ -42,14 +51,70 @@ def fetch_rss_feed(name: str, url: str) -> List[Dict[str, Any]]:
     return items
 
 
-def fetch_all_rss_feeds(rss_config: list) -> List[Dict[str, Any]]:
+def _parse_feed(name: str, body: bytes, headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    # Runs in a worker process; returns plain dicts so the result pickles cheaply.
+    # The response headers carry the declared charset and the base URL.
+    feed = feedparser.parse(body, response_headers=headers)
+    return _normalize_entries(name, feed)
+
+
+async def fetch_rss_feed(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    executor: Executor,
+    name: str,
+    url: str,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch a single RSS feed and return a list of normalized items.
+    Each item:
+      source: "rss"
+      external_id: link or guid
+      title, text, url, timestamp
+    """
+    async with semaphore:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            body = await resp.read()
+            # feedparser only looks up lowercase header names; content-location
+            # gives it the feed URL to resolve relative links against.
+            headers = {k.lower(): v for k, v in resp.headers.items()}
+            headers["content-location"] = str(resp.url)
+
+    # feedparser is CPU-bound pure Python, so parse in another process:
+    # feeds then parse in parallel instead of queueing behind the GIL.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_feed, name, body, headers)
+
+
+async def fetch_all_rss_feeds_async(rss_config: list) -> List[Dict[str, Any]]:
+    connector = aiohttp.TCPConnector(limit=50, limit_per_host=3, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=RSS_TIMEOUT_SECONDS)
+    headers = {"User-Agent": feedparser.USER_AGENT}
+    semaphore = asyncio.Semaphore(RSS_CONCURRENCY)
+    workers = max(1, min(len(rss_config), os.cpu_count() or 1))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT) as executor:
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=headers
+        ) as session:
+            results = await asyncio.gather(
+                *[
+                    fetch_rss_feed(session, semaphore, executor, feed_cfg["name"], feed_cfg["url"])
+                    for feed_cfg in rss_config
+                ],
+                return_exceptions=True,
+            )
+
     all_items: List[Dict[str, Any]] = []
-    for feed_cfg in rss_config:
-        name = feed_cfg["name"]
-        url = feed_cfg["url"]
-        try:
-            items = fetch_rss_feed(name, url)
-            all_items.extend(items)
-        except Exception as e:
-            print(f"[RSS] Error fetching {name} ({url}): {e}")
+    for feed_cfg, result in zip(rss_config, results):
+        if isinstance(result, Exception):
+            print(f"[RSS] Error fetching {feed_cfg['name']} ({feed_cfg['url']}): {result}")
+            continue
+        all_items.extend(result)
     return all_items
+
+
+def fetch_all_rss_feeds(rss_config: list) -> List[Dict[str, Any]]:
+    """Synchronous entry point: fetches all configured feeds concurrently."""
+    return asyncio.run(fetch_all_rss_feeds_async(rss_config))
@@ -0,0 +1,20 @@
+# core/config.py
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader  # libyaml-backed, much faster
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
+
+
+@lru_cache(maxsize=None)
+def load_config() -> Dict[str, Any]:
+    """Load config.yaml once per process; later calls return the same dict."""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_Loader)
@@ -1,16 +1,55 @@
 # core/db.py
+import atexit
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Tuple
 from datetime import datetime
 
 DB_PATH = Path(__file__).resolve().parent.parent / "osint.db"
 
+# One shared connection per process, opened lazily. It runs in autocommit
+# mode (isolation_level=None): single statements commit on their own and
+# multi-statement writes go through _write_transaction().
+_CONN: Optional[sqlite3.Connection] = None
+_LOCK = threading.Lock()
+
 
 def get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    global _CONN
+    if _CONN is None:
+        with _LOCK:
+            if _CONN is None:
+                conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+                conn.row_factory = sqlite3.Row
+                # WAL + NORMAL sync: commits no longer fsync the main db file every time.
+                conn.executescript(
+                    """
+                    PRAGMA journal_mode=WAL;
+                    PRAGMA synchronous=NORMAL;
+                    PRAGMA temp_store=MEMORY;
+                    PRAGMA cache_size=-20000;
+                    """
+                )
+                atexit.register(conn.close)
+                _CONN = conn
+    return _CONN
+
+
+@contextmanager
+def _write_transaction() -> Iterator[sqlite3.Cursor]:
+    """Run several writes under the lock as one BEGIN/COMMIT."""
+    conn = get_connection()
+    with _LOCK:
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            yield cur
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
 
 
 def init_db() -> None:
@@ -67,6 +106,12 @@ def init_db() -> None:
         """
     )
 
+    _init_event_cves()
+
+    # indexes for the event listing (created_at) and report source lookups (event_id)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_events_created_at ON events(created_at DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_event_sources_event_id ON event_sources(event_id)")
+
     # meta: key/value store
     cur.execute(
         """
@@ -77,38 +122,161 @@ def init_db() -> None:
         """
     )
 
-    conn.commit()
-    conn.close()
+    _init_raw_items_fts()
 
 
-def insert_raw_item(item: Dict[str, Any]) -> bool:
+def _init_raw_items_fts() -> None:
+    """
+    raw_items_fts: trigram full-text index over raw_items(title, text), kept in
+    sync by triggers. Trigrams give case-insensitive substring matching, so
+    detection can pre-filter a batch inside SQLite. Skipped when the SQLite
+    build lacks FTS5 or the trigram tokenizer (3.34+); detection then scans
+    every row in Python.
+    """
     conn = get_connection()
-    cur = conn.cursor()
-    created_at = datetime.utcnow().isoformat()
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raw_items_fts'"
+    ).fetchone():
+        return
 
     try:
+        with _write_transaction() as cur:
+            cur.execute(
+                """
+                CREATE VIRTUAL TABLE raw_items_fts USING fts5(
+                    title, text,
+                    content='raw_items', content_rowid='id', tokenize='trigram'
+                )
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER raw_items_fts_ai AFTER INSERT ON raw_items BEGIN
+                    INSERT INTO raw_items_fts (rowid, title, text) VALUES (new.id, new.title, new.text);
+                END
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER raw_items_fts_ad AFTER DELETE ON raw_items BEGIN
+                    INSERT INTO raw_items_fts (raw_items_fts, rowid, title, text)
+                    VALUES ('delete', old.id, old.title, old.text);
+                END
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER raw_items_fts_au AFTER UPDATE ON raw_items BEGIN
+                    INSERT INTO raw_items_fts (raw_items_fts, rowid, title, text)
+                    VALUES ('delete', old.id, old.title, old.text);
+                    INSERT INTO raw_items_fts (rowid, title, text) VALUES (new.id, new.title, new.text);
+                END
+                """
+            )
+            # index rows collected before the table existed
+            cur.execute("INSERT INTO raw_items_fts (raw_items_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        print(f"[db] Full-text index unavailable, detection will scan all rows: {e}")
+
+
+def _has_raw_items_fts() -> bool:
+    return get_connection().execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'raw_items_fts'"
+    ).fetchone() is not None
+
+
+def _init_event_cves() -> None:
+    """
+    event_cves: one row per (event, CVE) so lookups by CVE use an index
+    instead of LIKE over events.cves (which is still written for reporting).
+    The table, its index and the backfill from events.cves are committed
+    together, so an interrupted first run cannot leave an empty table behind.
+    """
+    conn = get_connection()
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_cves'"
+    ).fetchone():
+        return
+
+    with _write_transaction() as cur:
         cur.execute(
             """
-            INSERT INTO raw_items (source, external_id, title, text, url, timestamp, created_at, extra_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                item.get("source"),
-                item.get("external_id"),
-                item.get("title"),
-                item.get("text"),
-                item.get("url"),
-                item.get("timestamp"),
-                created_at,
-                item.get("extra_json"),
-            ),
+            CREATE TABLE event_cves (
+                event_id INTEGER NOT NULL,
+                cve_id TEXT NOT NULL,
+                PRIMARY KEY (event_id, cve_id),
+                FOREIGN KEY (event_id) REFERENCES events(id)
+            )
+            """
         )
-        conn.commit()
+        cur.execute("CREATE INDEX idx_event_cves_cve_id ON event_cves(cve_id)")
+
+        cur.execute("SELECT id, cves FROM events WHERE cves IS NOT NULL AND cves != ''")
+        cur.executemany(
+            "INSERT OR IGNORE INTO event_cves (event_id, cve_id) VALUES (?, ?)",
+            [(row["id"], cve) for row in cur.fetchall() for cve in _cve_list(row["cves"])],
+        )
+
+
+def insert_raw_item(item: Dict[str, Any]) -> bool:
+    conn = get_connection()
+    created_at = datetime.utcnow().isoformat()
+
+    try:
+        with _LOCK:
+            conn.execute(
+                """
+                INSERT INTO raw_items (source, external_id, title, text, url, timestamp, created_at, extra_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    item.get("source"),
+                    item.get("external_id"),
+                    item.get("title"),
+                    item.get("text"),
+                    item.get("url"),
+                    item.get("timestamp"),
+                    created_at,
+                    item.get("extra_json"),
+                ),
+            )
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
+
+
+def insert_raw_items_bulk(items: List[Dict[str, Any]]) -> int:
+    """
+    Insert many raw items in a single transaction.
+    Duplicates (same source + external_id) are skipped by the UNIQUE constraint.
+    returns number of newly inserted rows
+    """
+    if not items:
+        return 0
+
+    created_at = datetime.utcnow().isoformat()
+
+    with _write_transaction() as cur:
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO raw_items (source, external_id, title, text, url, timestamp, created_at, extra_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    item.get("source"),
+                    item.get("external_id"),
+                    item.get("title"),
+                    item.get("text"),
+                    item.get("url"),
+                    item.get("timestamp"),
+                    created_at,
+                    item.get("extra_json"),
+                )
+                for item in items
+            ],
+        )
+        return cur.rowcount
 
 
 # -------- meta helpers --------
@@ -118,26 +286,55 @@ def get_meta(key: str) -> Optional[str]:
     cur = conn.cursor()
     cur.execute("SELECT value FROM meta WHERE key = ?", (key,))
     row = cur.fetchone()
-    conn.close()
     return row["value"] if row else None
 
 
 def set_meta(key: str, value: str) -> None:
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO meta (key, value) VALUES (?, ?)
-        ON CONFLICT(key) DO UPDATE SET value = excluded.value
-        """,
-        (key, value),
-    )
-    conn.commit()
-    conn.close()
+    with _LOCK:
+        conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (key, value),
+        )
 
 
 # -------- event helpers --------
 
+def _cve_list(cves: Any) -> List[str]:
+    if isinstance(cves, list):
+        return cves
+    return [c.strip() for c in (cves or "").split(",") if c.strip()]
+
+
+def _event_row(event: Dict[str, Any], created_at: str) -> tuple:
+    return (
+        event.get("vendor"),
+        event.get("product"),
+        ",".join(_cve_list(event.get("cves"))),
+        event.get("severity"),
+        event.get("summary"),
+        event.get("vuln_type"),
+        event.get("exploitation_status"),
+        event.get("risk_score"),
+        int(bool(event.get("is_kev", False))),
+        created_at,
+    )
+
+
+_INSERT_EVENT_SQL = """
+    INSERT INTO events (
+        vendor, product, cves, severity, summary,
+        vuln_type, exploitation_status, risk_score, is_kev, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_EVENT_CVE_SQL = "INSERT OR IGNORE INTO event_cves (event_id, cve_id) VALUES (?, ?)"
+
+
 def insert_event(event: Dict[str, Any]) -> int:
     """
     event: {
@@ -146,61 +343,83 @@ def insert_event(event: Dict[str, Any]) -> int:
     }
     returns new event_id
     """
+    created_at = datetime.utcnow().isoformat()
+
+    with _write_transaction() as cur:
+        cur.execute(_INSERT_EVENT_SQL, _event_row(event, created_at))
+        event_id = cur.lastrowid
+        cur.executemany(
+            _INSERT_EVENT_CVE_SQL,
+            [(event_id, cve) for cve in _cve_list(event.get("cves"))],
+        )
+    return event_id
+
+
+def link_event_to_raw_item(event_id: int, raw_item_id: int) -> None:
     conn = get_connection()
-    cur = conn.cursor()
+    with _LOCK:
+        conn.execute(
+            """
+            INSERT INTO event_sources (event_id, raw_item_id)
+            VALUES (?, ?)
+            """,
+            (event_id, raw_item_id),
+        )
 
-    cves = event.get("cves")
-    if isinstance(cves, list):
-        cves_str = ",".join(cves)
-    else:
-        cves_str = cves or ""
+
+def insert_event_with_source(event: Dict[str, Any], raw_item_id: int) -> int:
+    """Insert an event and link it to its raw item in one transaction."""
+    return insert_events_bulk([event], [raw_item_id])[0]
+
+
+def insert_events_bulk(events: List[Dict[str, Any]], raw_item_ids: List[int]) -> List[int]:
+    """
+    Insert events, their event_cves rows and their event_sources links
+    in a single transaction. events[i] is linked to raw_item_ids[i].
+    returns the new event ids, in the same order as events
+    """
+    if len(events) != len(raw_item_ids):
+        raise ValueError("events and raw_item_ids must be the same length")
+    if not events:
+        return []
 
     created_at = datetime.utcnow().isoformat()
+    event_ids: List[int] = []
+    cve_pairs: List[tuple] = []
 
-    cur.execute(
-        """
-        INSERT INTO events (
-            vendor, product, cves, severity, summary,
-            vuln_type, exploitation_status, risk_score, is_kev, created_at
+    with _write_transaction() as cur:
+        # lastrowid is needed per row, so events go in one at a time;
+        # it is still a single commit for the whole batch.
+        for event in events:
+            cur.execute(_INSERT_EVENT_SQL, _event_row(event, created_at))
+            event_ids.append(cur.lastrowid)
+            cve_pairs.extend((cur.lastrowid, cve) for cve in _cve_list(event.get("cves")))
+
+        cur.executemany(_INSERT_EVENT_CVE_SQL, cve_pairs)
+        cur.executemany(
+            """
+            INSERT INTO event_sources (event_id, raw_item_id)
+            VALUES (?, ?)
+            """,
+            list(zip(event_ids, raw_item_ids)),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            event.get("vendor"),
-            event.get("product"),
-            cves_str,
-            event.get("severity"),
-            event.get("summary"),
-            event.get("vuln_type"),
-            event.get("exploitation_status"),
-            event.get("risk_score"),
-            int(bool(event.get("is_kev", False))),
-            created_at,
-        ),
-    )
-    event_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return event_id
 
+    return event_ids
 
-def link_event_to_raw_item(event_id: int, raw_item_id: int) -> None:
+
+def get_event_ids_for_cve(cve_id: str) -> List[int]:
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO event_sources (event_id, raw_item_id)
-        VALUES (?, ?)
-        """,
-        (event_id, raw_item_id),
+    cur = conn.execute(
+        "SELECT event_id FROM event_cves WHERE cve_id = ? ORDER BY event_id",
+        (cve_id.upper(),),
     )
-    conn.commit()
-    conn.close()
+    return [row["event_id"] for row in cur.fetchall()]
 
 
 def fetch_unprocessed_raw_items(batch_size: int = 200) -> List[sqlite3.Row]:
     """
     Fetch raw_items with id > last_processed_raw_item_id (tracked in meta).
+    Only the columns detection reads are selected (not extra_json).
     """
     last_id_str = get_meta("last_processed_raw_item_id")
     last_id = int(last_id_str) if last_id_str is not None else 0
@@ -209,16 +428,88 @@ def fetch_unprocessed_raw_items(batch_size: int = 200) -> List[sqlite3.Row]:
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT * FROM raw_items
+        SELECT id, source, title, text, url, timestamp FROM raw_items
         WHERE id > ?
         ORDER BY id ASC
         LIMIT ?
         """,
         (last_id, batch_size),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return cur.fetchall()
+
+
+def fetch_unprocessed_candidate_items(
+    terms: List[str],
+    sources: List[str],
+    batch_size: int = 200,
+) -> Tuple[List[sqlite3.Row], int]:
+    """
+    Same batch as fetch_unprocessed_raw_items, but only returns rows whose
+    title/text contains one of terms (case-insensitive substring) or whose
+    source is in sources. Matching runs in SQLite via raw_items_fts; terms
+    shorter than a trigram fall back to LIKE. Without the FTS table every
+    row of the batch is returned.
+    returns (rows, last raw_item id of the batch, 0 if the batch is empty)
+    """
+    last_id_str = get_meta("last_processed_raw_item_id")
+    last_id = int(last_id_str) if last_id_str is not None else 0
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT MAX(id) FROM (
+            SELECT id FROM raw_items
+            WHERE id > ?
+            ORDER BY id ASC
+            LIMIT ?
+        )
+        """,
+        (last_id, batch_size),
+    )
+    batch_end = cur.fetchone()[0]
+    if batch_end is None:
+        return [], 0
+
+    where = ["id > ?", "id <= ?"]
+    params: List[Any] = [last_id, batch_end]
+
+    if _has_raw_items_fts():
+        filters = []
+        if sources:
+            filters.append(f"source IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+
+        fts_terms = [t for t in terms if len(t) >= 3]
+        if fts_terms:
+            filters.append(
+                """
+                id IN (
+                    SELECT rowid FROM raw_items_fts
+                    WHERE raw_items_fts MATCH ? AND rowid > ? AND rowid <= ?
+                )
+                """
+            )
+            params.append(" OR ".join('"' + t.replace('"', '""') + '"' for t in fts_terms))
+            params.extend([last_id, batch_end])
+
+        for t in terms:
+            if len(t) < 3:
+                pattern = "%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                filters.append("(title LIKE ? ESCAPE '\\' OR text LIKE ? ESCAPE '\\')")
+                params.extend([pattern, pattern])
+
+        where.append("(" + " OR ".join(filters or ["0"]) + ")")
+
+    cur.execute(
+        f"""
+        SELECT id, source, title, text, url, timestamp FROM raw_items
+        WHERE {" AND ".join(where)}
+        ORDER BY id ASC
+        """,
+        params,
+    )
+    return cur.fetchall(), batch_end
 
 
 def update_last_processed_raw_item_id(new_last_id: int) -> None:
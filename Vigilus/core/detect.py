@@ -1,54 +1,173 @@
 import re
-from typing import Dict, Any, List
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+
+import ahocorasick
 
 from .db import (
-    fetch_unprocessed_raw_items,
+    fetch_unprocessed_candidate_items,
     update_last_processed_raw_item_id,
-    insert_event,
-    link_event_to_raw_item,
+    insert_events_bulk,
 )
 
-CVE_REGEX = re.compile(r"CVE-\d{4}-\d{4,7}", re.IGNORECASE)
+# CVE ids are pure ASCII, so skip Unicode-aware matching.
+CVE_REGEX = re.compile(r"CVE-\d{4}-\d{4,7}", re.IGNORECASE | re.ASCII)
+_BATCH_SEP = "\x1e"  # record separator, can never be part of a CVE id
 
 
 def extract_cves(text: str) -> List[str]:
-    return list({m.upper() for m in CVE_REGEX.findall(text or "")})
-
+    return list(dict.fromkeys(m.upper() for m in CVE_REGEX.findall(text or "")))
 
-def classify_vuln_type(full_text: str) -> str:
-    ft = full_text.lower()
-
-    if any(k in ft for k in ["remote code execution", "rce", "execute arbitrary code"]):
-        return "RCE"
-    if any(k in ft for k in ["auth bypass", "authentication bypass", "bypass authentication", "unauthenticated access"]):
-        return "auth_bypass"
-    if any(k in ft for k in ["privilege escalation", "elevation of privilege", "escalate privileges", "eop"]):
-        return "priv_esc"
-    if any(k in ft for k in ["denial of service", "dos", "service unavailable", "crash the service"]):
-        return "dos"
-    if any(k in ft for k in ["information disclosure", "info disclosure", "leak information", "data exposure"]):
-        return "info_disc"
 
+def extract_cves_batch(texts: List[str]) -> List[List[str]]:
+    """
+    Same as extract_cves for many texts, but with a single regex scan:
+    texts are joined with a separator and matches are mapped back by offset.
+    """
+    starts: List[int] = []
+    pos = 0
+    for t in texts:
+        starts.append(pos)
+        pos += len(t or "") + len(_BATCH_SEP)
+
+    found: List[Dict[str, None]] = [{} for _ in texts]
+    joined = _BATCH_SEP.join(t or "" for t in texts)
+    for m in CVE_REGEX.finditer(joined):
+        found[bisect_right(starts, m.start()) - 1][m.group().upper()] = None
+
+    return [list(f) for f in found]
+
+
+# Classification keywords, checked in order: the first group with a hit wins.
+VULN_TYPE_TERMS: List[Tuple[str, List[str]]] = [
+    ("RCE", ["remote code execution", "rce", "execute arbitrary code"]),
+    ("auth_bypass", ["auth bypass", "authentication bypass", "bypass authentication", "unauthenticated access"]),
+    ("priv_esc", ["privilege escalation", "elevation of privilege", "escalate privileges", "eop"]),
+    ("dos", ["denial of service", "dos", "service unavailable", "crash the service"]),
+    ("info_disc", ["information disclosure", "info disclosure", "leak information", "data exposure"]),
+]
+
+EXPLOITATION_TERMS: List[Tuple[str, List[str]]] = [
+    ("known_exploited", ["actively exploited", "exploited in the wild", "in the wild", "under active exploitation"]),
+    ("poc_available", ["proof of concept", "poc released", "exploit code", "exploit available"]),
+    ("under_attack", ["under attack", "targeted attacks", "observed exploitation", "being exploited"]),
+]
+
+
+def _first_label(ft: str, groups: List[Tuple[str, List[str]]]) -> str:
+    for label, terms in groups:
+        if any(k in ft for k in terms):
+            return label
     return "unknown"
 
 
-def classify_exploitation_status(full_text: str, is_kev: bool) -> str:
-    ft = full_text.lower()
+def classify_vuln_type(full_text: str) -> str:
+    return _first_label(full_text.lower(), VULN_TYPE_TERMS)
+
 
+def classify_exploitation_status(full_text: str, is_kev: bool) -> str:
     # KEV usually implies known exploitation in the wild
     if is_kev:
         return "known_exploited"
 
-    if any(k in ft for k in ["actively exploited", "exploited in the wild", "in the wild", "under active exploitation"]):
-        return "known_exploited"
+    return _first_label(full_text.lower(), EXPLOITATION_TERMS)
+
+
+def build_term_matcher(
+    vendors: List[str],
+    high_terms: List[str],
+    medium_terms: List[str],
+) -> Dict[str, Any]:
+    """
+    Prepare the detection terms once per run: all terms, including the
+    classification keywords, are lowercased into a single Aho-Corasick
+    automaton, so each item is scanned once instead of once per term.
+    Each automaton key maps to a list of (kind, index) since a term may
+    sit in several buckets.
+    """
+    buckets: Dict[str, List[Tuple[str, int]]] = {}
+    for kind, terms in (("vendor", vendors), ("high", high_terms), ("medium", medium_terms)):
+        for idx, term in enumerate(terms):
+            buckets.setdefault(term.lower(), []).append((kind, idx))
+    # for classification the index is the group's rank (lower wins)
+    for kind, groups in (("vuln_type", VULN_TYPE_TERMS), ("exploitation", EXPLOITATION_TERMS)):
+        for rank, (_, terms) in enumerate(groups):
+            for term in terms:
+                buckets.setdefault(term, []).append((kind, rank))
+
+    automaton = ahocorasick.Automaton()
+    for key, hits in buckets.items():
+        automaton.add_word(key, hits)
+    automaton.make_automaton()
 
-    if any(k in ft for k in ["proof of concept", "poc released", "exploit code", "exploit available"]):
-        return "poc_available"
+    return {
+        "vendors": list(vendors),  # display names, indexed by the automaton hits
+        "has_high": bool(high_terms),
+        "has_medium": bool(medium_terms),
+        "automaton": automaton,
+    }
 
-    if any(k in ft for k in ["under attack", "targeted attacks", "observed exploitation", "being exploited"]):
-        return "under_attack"
 
-    return "unknown"
+def match_terms(
+    texts_lower: Tuple[str, ...],
+    matcher: Dict[str, Any],
+    is_kev: bool = False,
+) -> Dict[str, Any]:
+    """
+    Scan already-lowercased texts (e.g. title and body, scanned separately
+    rather than concatenated) for the detection terms. Returns:
+      vendor: first configured vendor found (config order) or None
+      high, medium: whether any high / medium risk term was found
+      vuln_type, exploitation: as classify_vuln_type / classify_exploitation_status
+      (the latter without the KEV override)
+    KEV items are always HIGH and known_exploited, so with is_kev=True the
+    scan stops as soon as vendor and vuln_type are settled; high, medium
+    and exploitation may then be incomplete and should not be used.
+    """
+    vendors = matcher["vendors"]
+    automaton = matcher["automaton"]
+
+    best = {"vendor": None, "vuln_type": None, "exploitation": None}
+    high_hit = False
+    med_hit = False
+    done = False
+    for text in texts_lower:
+        for _, hits in automaton.iter(text):
+            for kind, idx in hits:
+                if kind == "high":
+                    high_hit = True
+                elif kind == "medium":
+                    med_hit = True
+                elif best[kind] is None or idx < best[kind]:
+                    best[kind] = idx
+            # nothing left to learn once every bucket has its top-ranked hit
+            done = (
+                (best["vendor"] == 0 or not vendors)
+                and best["vuln_type"] == 0
+                and (
+                    is_kev
+                    or (
+                        (high_hit or not matcher["has_high"])
+                        and (med_hit or not matcher["has_medium"])
+                        and best["exploitation"] == 0
+                    )
+                )
+            )
+            if done:
+                break
+        if done:
+            break
+
+    def label(kind: str, groups: List[Tuple[str, List[str]]]) -> str:
+        return groups[best[kind]][0] if best[kind] is not None else "unknown"
+
+    return {
+        "vendor": vendors[best["vendor"]] if best["vendor"] is not None else None,
+        "high": high_hit,
+        "medium": med_hit,
+        "vuln_type": label("vuln_type", VULN_TYPE_TERMS),
+        "exploitation": label("exploitation", EXPLOITATION_TERMS),
+    }
 
 
 def compute_risk_score(
@@ -92,61 +211,66 @@ def compute_risk_score(
     return min(score, 100)
 
 
+def _item_text(item: Dict[str, Any]) -> Tuple[str, str]:
+    return (item.get("title") or "")[:300], item.get("text") or ""
+
+
 def score_item(
     item: Dict[str, Any],
-    vendors: List[str],
-    high_terms: List[str],
-    medium_terms: List[str],
+    matcher: Dict[str, Any],
+    cves: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """
+    cves can be passed in when already extracted for the batch.
     Return a dict with keys:
       should_create_event: bool
       vendor, product, cves, severity, summary,
       vuln_type, exploitation_status, risk_score, is_kev
     Or should_create_event=False if it's not interesting enough.
     """
-    title = (item.get("title") or "")[:300]
-    text = item.get("text") or ""
-    full = f"{title}\n{text}"
-    full_lower = full.lower()
-
-    # vendor detection (simple substring match)
-    matched_vendor = None
-    for v in vendors:
-        if v.lower() in full_lower:
-            matched_vendor = v
-            break
-
-    cves = extract_cves(full)
-    has_cves = bool(cves)
-
-    high_hit = any(term.lower() in full_lower for term in high_terms)
-    med_hit = any(term.lower() in full_lower for term in medium_terms)
+    title, text = _item_text(item)
+    # title and body are lowercased and scanned separately, no concatenation
+    texts_lower = (title.lower(), text.lower())
 
     # Is this from KEV?
     is_kev = (item.get("source") == "cisa_kev")
 
+    # vendor, risk term and classification detection in one scan (substring match);
+    # for KEV the risk terms don't affect severity, so the scan can stop earlier
+    hits = match_terms(texts_lower, matcher, is_kev=is_kev)
+    matched_vendor = hits["vendor"]
+    high_hit = hits["high"]
+    med_hit = hits["medium"]
+
+    if cves is None:
+        cves = list(dict.fromkeys(extract_cves(title) + extract_cves(text)))
+    has_cves = bool(cves)
+
     # Decide if we care at all
     if not matched_vendor and not has_cves and not is_kev:
         # Ignore for now: no vendor, no CVE, not KEV.
         return {"should_create_event": False}
 
-    # Base severity
-    severity = None
-    if matched_vendor and (high_hit or (has_cves and high_hit) or is_kev):
-        severity = "HIGH"
-    elif matched_vendor and (has_cves or med_hit):
-        severity = "MEDIUM"
-    elif is_kev:
+    # Base severity. KEV is always HIGH.
+    if is_kev:
         severity = "HIGH"
-    elif has_cves and high_hit:
+    elif matched_vendor:
+        if high_hit:
+            severity = "HIGH"
+        elif has_cves or med_hit:
+            severity = "MEDIUM"
+        else:
+            return {"should_create_event": False}
+    elif high_hit:
+        # CVE but no vendor
         severity = "MEDIUM"
     else:
         # Too weak a signal, skip
         return {"should_create_event": False}
 
-    vuln_type = classify_vuln_type(full)
-    exploitation_status = classify_exploitation_status(full, is_kev=is_kev)
+    vuln_type = hits["vuln_type"]
+    # KEV usually implies known exploitation in the wild
+    exploitation_status = "known_exploited" if is_kev else hits["exploitation"]
     risk_score = compute_risk_score(
         severity=severity,
         vuln_type=vuln_type,
@@ -181,26 +305,34 @@ def run_detection(config: Dict[str, Any], batch_size: int = 200) -> None:
         print("[detect] No detection config found, nothing to do.")
         return
 
+    matcher = build_term_matcher(vendors, high_terms, medium_terms)
+
     print("[detect] Fetching unprocessed raw items...")
-    rows = fetch_unprocessed_raw_items(batch_size=batch_size)
-    if not rows:
+    # Only items naming a vendor or a CVE, or coming from KEV, can become
+    # events, so let SQLite narrow the batch down to those first.
+    rows, max_id_seen = fetch_unprocessed_candidate_items(
+        terms=vendors + ["CVE-"],
+        sources=["cisa_kev"],
+        batch_size=batch_size,
+    )
+    if not max_id_seen:
         print("[detect] No new raw items to process.")
         return
 
-    print(f"[detect] Processing {len(rows)} raw items...")
-    max_id_seen = 0
-    events_created = 0
+    print(f"[detect] Processing {len(rows)} candidate raw items (up to id {max_id_seen})...")
+    pending_events: List[Dict[str, Any]] = []
+    pending_raw_item_ids: List[int] = []
 
-    for row in rows:
-        item = dict(row)
-        max_id_seen = max(max_id_seen, item["id"])
+    items = [dict(row) for row in rows]
+    # title and text go in as separate pieces, two per item
+    piece_cves = extract_cves_batch([piece for item in items for piece in _item_text(item)])
+    batch_cves = [
+        list(dict.fromkeys(piece_cves[i] + piece_cves[i + 1]))
+        for i in range(0, len(piece_cves), 2)
+    ]
 
-        scored = score_item(
-            item=item,
-            vendors=vendors,
-            high_terms=high_terms,
-            medium_terms=medium_terms,
-        )
+    for item, cves in zip(items, batch_cves):
+        scored = score_item(item=item, matcher=matcher, cves=cves)
 
         if not scored.get("should_create_event"):
             continue
@@ -217,9 +349,12 @@ def run_detection(config: Dict[str, Any], batch_size: int = 200) -> None:
             "is_kev": scored.get("is_kev", False),
         }
 
-        event_id = insert_event(event_data)
-        link_event_to_raw_item(event_id, item["id"])
-        events_created += 1
+        pending_events.append(event_data)
+        pending_raw_item_ids.append(item["id"])
+
+    # One transaction for the whole batch instead of two commits per event.
+    insert_events_bulk(pending_events, pending_raw_item_ids)
+    events_created = len(pending_events)
 
     if max_id_seen:
         update_last_processed_raw_item_id(max_id_seen)
@@ -1,8 +1,10 @@
 # core/reporting.py
-from docx import Document
+import re
+import zipfile
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
+from xml.sax.saxutils import escape
 
 from .db import get_connection  # reuse your DB helper
 
@@ -11,58 +13,126 @@ OUTPUT_DIR = Path(__file__).resolve().parent.parent / "generated_reports"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
-def _replace_placeholder(doc: Document, placeholder: str, value: str) -> None:
-    """Simple global find/replace for placeholders in all paragraphs and table cells."""
-    if value is None:
-        value = ""
+# Placeholders are filled straight in word/document.xml instead of loading the
+# document into python-docx. Like before, a placeholder must sit inside a
+# single run (w:t element) of the template to be found.
+_DOCUMENT_XML = "word/document.xml"
+_WT_RE = re.compile(r"<w:t(?:\s[^>]*)?>([^<]*)</w:t>")
+_XML_INVALID_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# python-docx turned both \r and \n into breaks; treat \r\n as one
+_LINE_BREAK_RE = re.compile(r"\r\n|\r|\n")
+
+
+def _text_xml(text: str) -> str:
+    """Escaped run content for text, with newlines/tabs as Word breaks/tabs."""
+    parts = []
+    for i, line in enumerate(_LINE_BREAK_RE.split(_XML_INVALID_RE.sub("", text))):
+        if i:
+            parts.append("<w:br/>")
+        for j, chunk in enumerate(line.split("\t")):
+            if j:
+                parts.append("<w:tab/>")
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+    return "".join(parts)
+
+
+def _replace_placeholders(xml: str, mapping: Dict[str, str]) -> str:
+    """Find/replace all placeholders in one pass over the document's text elements."""
+    values = {k: (v if v is not None else "") for k, v in mapping.items()}
+    pattern = re.compile("|".join(re.escape(k) for k in values))
+
+    def fill(m: "re.Match[str]") -> str:
+        text = m.group(1)  # already XML-escaped template text
+        if not pattern.search(text):
+            return m.group(0)
+
+        out = []
+        pos = 0
+        for pm in pattern.finditer(text):
+            if pm.start() > pos:
+                out.append(f'<w:t xml:space="preserve">{text[pos:pm.start()]}</w:t>')
+            out.append(_text_xml(values[pm.group(0)]))
+            pos = pm.end()
+        if pos < len(text):
+            out.append(f'<w:t xml:space="preserve">{text[pos:]}</w:t>')
+        return "".join(out)
+
+    return _WT_RE.sub(fill, xml)
+
+
+_SQL_CHUNK = 500  # stay under SQLite's host-parameter limit
+
+
+def _get_events_with_sources(event_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Load several events and their sources with one query per table
+    (per chunk of ids). Rows come back as plain dicts.
+    returns {event_id: {"event": {...}, "sources": [{...}, ...]}}
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    ids = list(dict.fromkeys(event_ids))
+    result: Dict[int, Dict[str, Any]] = {}
+
+    for i in range(0, len(ids), _SQL_CHUNK):
+        chunk = ids[i:i + _SQL_CHUNK]
+        marks = ",".join("?" * len(chunk))
+
+        cur.execute(
+            f"SELECT id, summary, severity, vendor, cves FROM events WHERE id IN ({marks})",
+            chunk,
+        )
+        for row in cur.fetchall():
+            result[row["id"]] = {"event": dict(row), "sources": []}
+
+        cur.execute(
+            f"""
+            SELECT es.event_id, ri.source, ri.title, ri.url
+            FROM event_sources es
+            JOIN raw_items ri ON es.raw_item_id = ri.id
+            WHERE es.event_id IN ({marks})
+            ORDER BY es.id
+            """,
+            chunk,
+        )
+        for row in cur.fetchall():
+            result[row["event_id"]]["sources"].append(dict(row))
+
+    return result
 
-    for p in doc.paragraphs:
-        if placeholder in p.text:
-            for run in p.runs:
-                if placeholder in run.text:
-                    run.text = run.text.replace(placeholder, value)
 
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                if placeholder in cell.text:
-                    for p in cell.paragraphs:
-                        for run in p.runs:
-                            if placeholder in run.text:
-                                run.text = run.text.replace(placeholder, value)
+def _get_event_with_sources(event_id: int) -> Dict[str, Any]:
+    data = _get_events_with_sources([event_id]).get(event_id)
+    if not data:
+        raise ValueError(f"No event found with id {event_id}")
+    return data
 
 
-def _get_event_with_sources(event_id: int) -> Dict[str, Any]:
-    conn = get_connection()
-    cur = conn.cursor()
+def generate_advisory_docx(event_id: int) -> Path:
+    return _render_advisory(_get_event_with_sources(event_id))
 
-    cur.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-    event = cur.fetchone()
-    if not event:
-        conn.close()
-        raise ValueError(f"No event found with id {event_id}")
 
-    cur.execute(
-        """
-        SELECT ri.*
-        FROM event_sources es
-        JOIN raw_items ri ON es.raw_item_id = ri.id
-        WHERE es.event_id = ?
-        """,
-        (event_id,),
-    )
-    sources = cur.fetchall()
-    conn.close()
-    return {"event": event, "sources": sources}
+def generate_advisories_bulk(event_ids: List[int]) -> List[Path]:
+    """
+    Generate advisories for many events, reading the DB in bulk.
+    Rendering is just a zip copy plus one regex pass per document, so it
+    runs in-process.
+    returns output paths in the same order as event_ids
+    """
+    data = _get_events_with_sources(event_ids)
+    missing = [i for i in event_ids if i not in data]
+    if missing:
+        raise ValueError(f"No event found with id(s) {', '.join(map(str, missing))}")
 
+    paths = {i: _render_advisory(data[i]) for i in dict.fromkeys(event_ids)}
+    return [paths[i] for i in event_ids]
 
-def generate_advisory_docx(event_id: int) -> Path:
-    data = _get_event_with_sources(event_id)
+
+def _render_advisory(data: Dict[str, Any]) -> Path:
     ev = data["event"]
     sources = data["sources"]
 
-    doc = Document(TEMPLATE_PATH)
-
     # Build fields
     title = ev["summary"] or "Security Advisory"
     date_str = datetime.utcnow().strftime("%Y-%m-%d")
@@ -89,21 +159,31 @@ def generate_advisory_docx(event_id: int) -> Path:
     references_lines = [s["url"] for s in sources if s["url"]]
     references_text = "\n".join(references_lines)
 
-    # Replace placeholders
-    _replace_placeholder(doc, "{{TITLE}}", title)
-    _replace_placeholder(doc, "{{DATE}}", date_str)
-    _replace_placeholder(doc, "{{SEVERITY}}", severity)
-    _replace_placeholder(doc, "{{VENDOR}}", vendor)
-    _replace_placeholder(doc, "{{CVES}}", cves)
-    _replace_placeholder(doc, "{{SUMMARY}}", summary)
-    _replace_placeholder(doc, "{{DETAILS}}", details_text)
-    _replace_placeholder(doc, "{{RECOMMENDATIONS}}", recommendations_text)
-    _replace_placeholder(doc, "{{REFERENCES}}", references_text)
+    # Placeholder values
+    mapping = {
+        "{{TITLE}}": title,
+        "{{DATE}}": date_str,
+        "{{SEVERITY}}": severity,
+        "{{VENDOR}}": vendor,
+        "{{CVES}}": cves,
+        "{{SUMMARY}}": summary,
+        "{{DETAILS}}": details_text,
+        "{{RECOMMENDATIONS}}": recommendations_text,
+        "{{REFERENCES}}": references_text,
+    }
 
     # Save
     safe_title = "".join(c for c in title if c.isalnum() or c in (" ", "_", "-"))[:80].strip().replace(" ", "_")
-    filename = f"Advisory_{safe_title}_{date_str}.docx"
+    # event id keeps advisories for events with the same summary apart
+    filename = f"Advisory_{ev['id']}_{safe_title}_{date_str}.docx"
     output_path = OUTPUT_DIR / filename
-    doc.save(output_path)
+
+    # Copy the template zip entry by entry, filling placeholders in the body.
+    with zipfile.ZipFile(TEMPLATE_PATH) as zin, zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zout:
+        for entry in zin.infolist():
+            content = zin.read(entry.filename)
+            if entry.filename == _DOCUMENT_XML:
+                content = _replace_placeholders(content.decode("utf-8"), mapping).encode("utf-8")
+            zout.writestr(entry, content)
 
     return output_path
\ No newline at end of file
@@ -1,27 +1,16 @@
-import yaml
-from pathlib import Path
-
-from core.db import init_db, insert_raw_item
+from core.config import load_config
+from core.db import init_db, insert_raw_items_bulk
 from collectors.rss_collector import fetch_all_rss_feeds
 from collectors.cisa_kev_collector import fetch_cisa_kev
 
 
-CONFIG_PATH = Path(__file__).resolve().parent / "config.yaml"
-
-
-def load_config():
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-
 def main():
     config = load_config()
 
     print("[*] Initializing database (if needed)...")
     init_db()
 
-    total_inserted = 0
-    total_seen = 0
+    all_items = []
 
     # RSS feeds
     rss_config = config.get("rss_feeds", [])
@@ -29,10 +18,7 @@ def main():
         print(f"[*] Fetching RSS feeds ({len(rss_config)} configured)...")
         rss_items = fetch_all_rss_feeds(rss_config)
         print(f"    Retrieved {len(rss_items)} RSS items.")
-        for item in rss_items:
-            total_seen += 1
-            if insert_raw_item(item):
-                total_inserted += 1
+        all_items.extend(rss_items)
 
     # CISA KEV
     cisa_cfg = config.get("cisa_kev", {})
@@ -43,13 +29,13 @@ def main():
             try:
                 kev_items = fetch_cisa_kev(kev_url)
                 print(f"    Retrieved {len(kev_items)} KEV entries.")
-                for item in kev_items:
-                    total_seen += 1
-                    if insert_raw_item(item):
-                        total_inserted += 1
+                all_items.extend(kev_items)
             except Exception as e:
                 print(f"[CISA KEV] Error: {e}")
 
+    total_seen = len(all_items)
+    total_inserted = insert_raw_items_bulk(all_items)
+
     print(f"[*] Done. Seen: {total_seen}, newly inserted: {total_inserted}")
 
 
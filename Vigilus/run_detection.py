@@ -1,16 +1,7 @@
-import yaml
-from pathlib import Path
-
+from core.config import load_config
 from core.db import init_db
 from core.detect import run_detection
 
-CONFIG_PATH = Path(__file__).resolve().parent / "config.yaml"
-
-
-def load_config():
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
 
 def main():
     print("[*] Initializing database (if needed)...")